@@ -1,21 +1,71 @@
 import streamlit as st
 import helper
-import warnings
 import numpy as np
-import plotly.graph_objects as go
-import plotly.express as px
-import time
+import pandas as pd
 
 # Optional: Try to import streamlit_lottie, but don't fail if it's not available
 try:
     from streamlit_lottie import st_lottie
-    import requests
 
     LOTTIE_AVAILABLE = True
 except ImportError:
     LOTTIE_AVAILABLE = False
 
-warnings.filterwarnings("ignore")
+# Display names for the slices of the feature vector built by helper.query_point_creator
+BASIC_LABELS = ("Q1 Length", "Q2 Length", "Q1 Word Count", "Q2 Word Count",
+                "Common Words", "Total Words", "Common/Total Ratio")
+TOKEN_LABELS = ("Common Word Ratio", "Word Ratio Max", "Stop Word Ratio", "Stop Word Ratio Max",
+                "Token Ratio", "Token Ratio Max", "Last Word Match", "First Word Match")
+LENGTH_LABELS = ("Absolute Length Diff", "Average Token Length", "Longest Common Substring Ratio")
+FUZZY_LABELS = ("Fuzz Ratio", "Partial Ratio", "Token Sort Ratio", "Token Set Ratio")
+
+
+# Similarity meter markup; the gradient colours are fixed per score band
+def _meter_template(start_color, end_color):
+    return """
+<div class="similarity-meter">
+    <div class="similarity-fill" style="width: {w}%;
+    background: linear-gradient(90deg, """ + start_color + " 0%, " + end_color + """ 100%);">
+    </div>
+</div>
+<p style="text-align: center; font-weight: bold; font-size: 1.5rem; margin: 10px 0;">
+    {score:.2f}
+</p>
+"""
+
+
+LOW_METER_TPL = _meter_template("#ff4e50", "#f9d423")
+MID_METER_TPL = _meter_template("#ffd452", "#1cb142")
+HIGH_METER_TPL = _meter_template("#1cb142", "#0f9b0f")
+
+# Result messages shown under the similarity meter
+DUP_HTML = """
+<div style="background-color: rgba(28, 177, 66, 0.1); border-left: 5px solid #1cb142;
+padding: 15px; border-radius: 5px; margin-top: 20px;">
+    <p style="font-size: 18px; font-weight: bold; color: #1cb142; margin: 0;">
+        The questions are very similar or duplicates!
+    </p>
+</div>
+"""
+NOT_DUP_HTML = """
+<div style="background-color: rgba(75, 108, 183, 0.1); border-left: 5px solid #4b6cb7;
+padding: 15px; border-radius: 5px; margin-top: 20px;">
+    <p style="font-size: 18px; font-weight: bold; color: #4b6cb7; margin: 0;">
+        The questions are not duplicates.
+    </p>
+</div>
+"""
+
+
+# Cached so reruns don't re-download the animation JSON. Failures raise
+# instead of returning None so they are not cached.
+@st.cache_data(ttl=3600, show_spinner=False)
+def _fetch_lottie_json(url):
+    import requests
+
+    r = requests.get(url, timeout=2)
+    r.raise_for_status()
+    return r.json()
 
 
 # Function to load Lottie animations with error handling
@@ -23,24 +73,139 @@ def load_lottieurl(url):
     if not LOTTIE_AVAILABLE:
         return None
     try:
-        r = requests.get(url)
-        if r.status_code != 200:
-            return None
-        return r.json()
+        return _fetch_lottie_json(url)
     except:
         return None
 
 
-# Page configuration with custom theme
-st.set_page_config(
-    page_title="Question Similarity Detector",
-    page_icon="🔍",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Cache feature extraction so re-submitting the same pair skips the NLP pipeline.
+# The query point only depends on the preprocessed text, so keying on it lets
+# case, whitespace, HTML and punctuation variants of a pair share one entry.
+@st.cache_data(max_entries=512, show_spinner=False)
+def _cached_qpc(a, b):
+    return helper.query_point_from_preprocessed(a, b)
 
-# Custom CSS
-st.markdown("""
+
+def cached_query_point(q1, q2):
+    return _cached_qpc(helper.preprocess(q1), helper.preprocess(q2))
+
+
+# The batch table only shows similarity scores, so only those are computed
+@st.cache_data(max_entries=32, show_spinner=False)
+def cached_similarity_scores(qs1, qs2):
+    return helper.batch_cosine_similarity(list(qs1), list(qs2))
+
+
+# Figures are deterministic in the feature values, so cache them per feature tuple.
+# plotly is imported lazily so the first page render doesn't pay for it.
+@st.cache_data(max_entries=128, show_spinner=False)
+def _make_token_fig(features):
+    import plotly.express as px
+
+    # Create bar chart for token features
+    token_fig = px.bar(
+        x=TOKEN_LABELS,
+        y=features,
+        labels={"x": "Feature", "y": "Value"},
+        title="Token Features Comparison",
+        color=features,
+        color_continuous_scale="Blues",
+        template="plotly_white"
+    )
+    token_fig.update_layout(height=400)
+    return token_fig
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _make_fuzzy_fig(features):
+    import plotly.graph_objects as go
+
+    # Create radar chart for fuzzy features
+    fuzzy_fig = go.Figure()
+    fuzzy_fig.add_trace(go.Scatterpolar(
+        r=features,
+        theta=FUZZY_LABELS,
+        fill='toself',
+        name='Fuzzy Features',
+        line_color='#4b6cb7'
+    ))
+    fuzzy_fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 100]
+            )
+        ),
+        title="Fuzzy Matching Features",
+        height=400,
+        template="plotly_white"
+    )
+    return fuzzy_fig
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def _make_3d_fig(features):
+    import plotly.graph_objects as go
+
+    center = np.asarray(features, dtype=np.float32)
+
+    # Create a sample of points around our query point for visualization.
+    # Seeded so the figure only depends on the features it is cached on.
+    rng = np.random.default_rng(0)
+    n_points = 50
+    pts = center + rng.standard_normal((n_points, 3), dtype=np.float32) * (0.2 * center)
+
+    # Color based on distance from our point (simulating similarity)
+    d = pts - center
+    distances = np.sqrt(np.einsum("ij,ij->i", d, d))
+
+    # Create 3D scatter plot
+    fig_3d = go.Figure(data=[
+        # Background points
+        go.Scatter3d(
+            x=pts[:, 0], y=pts[:, 1], z=pts[:, 2],
+            mode='markers',
+            marker=dict(
+                size=5,
+                color=distances,
+                colorscale='Blues',
+                opacity=0.6
+            ),
+            name='Feature Space'
+        ),
+        # Our query point
+        go.Scatter3d(
+            x=[center[0]], y=[center[1]], z=[center[2]],
+            mode='markers',
+            marker=dict(
+                size=10,
+                color='red',
+                symbol='diamond'
+            ),
+            name='Current Query'
+        )
+    ])
+
+    # Update layout
+    fig_3d.update_layout(
+        title="3D Feature Space Visualization",
+        scene=dict(
+            xaxis_title="Question 1 Length",
+            yaxis_title="Question 2 Length",
+            zaxis_title="Word Count Q1",
+            xaxis=dict(backgroundcolor="#f5f7ff"),
+            yaxis=dict(backgroundcolor="#f5f7ff"),
+            zaxis=dict(backgroundcolor="#f5f7ff")
+        ),
+        height=600,
+        margin=dict(l=0, r=0, b=0, t=30)
+    )
+    return fig_3d
+
+
+# Static page chrome (custom CSS and title section) sent in a single markdown call.
+# It has to be emitted on every run: Streamlit removes elements a rerun doesn't redraw.
+PAGE_HEADER_HTML = """
 <style>
     .main {
         background-color: #f5f7ff;
@@ -74,7 +239,7 @@ st.markdown("""
         font-weight: bold;
         font-size: 1.2rem;
     }
-    .stButton>button {
+    .stButton>button, .stFormSubmitButton>button {
         background: linear-gradient(90deg, #4b6cb7 0%, #182848 100%);
         color: white;
         border: none;
@@ -84,7 +249,7 @@ st.markdown("""
         box-shadow: 0 2px 5px rgba(0,0,0,0.2);
         transition: all 0.3s ease;
     }
-    .stButton>button:hover {
+    .stButton>button:hover, .stFormSubmitButton>button:hover {
         transform: translateY(-2px);
         box-shadow: 0 5px 15px rgba(0,0,0,0.3);
     }
@@ -111,10 +276,6 @@ st.markdown("""
         color: #4b6cb7;
     }
 </style>
-""", unsafe_allow_html=True)
-
-# Title section with gradient background
-st.markdown("""
 <div class="title-container">
     <h1 style='text-align: center; color: white; margin: 0;'>
         <span style='font-size: 42px;'>🔍 Question Similarity Detector</span>
@@ -123,7 +284,18 @@ st.markdown("""
         Advanced NLP tool to detect similarity between questions
     </p>
 </div>
-""", unsafe_allow_html=True)
+"""
+
+# Page configuration with custom theme
+st.set_page_config(
+    page_title="Question Similarity Detector",
+    page_icon="🔍",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS and title section with gradient background
+st.markdown(PAGE_HEADER_HTML, unsafe_allow_html=True)
 
 # Sidebar for information and settings
 with st.sidebar:
@@ -153,6 +325,10 @@ with st.sidebar:
         step=0.01,
         help="Adjust the threshold for determining duplicate questions"
     )
+    batch_mode = st.checkbox(
+        "Batch mode",
+        help="Compare many question pairs at once, one tab-separated pair per line"
+    )
 
     # Display icon instead of animation if Lottie is not available
     if LOTTIE_AVAILABLE:
@@ -164,51 +340,90 @@ with st.sidebar:
     else:
         st.markdown('<div class="icon-container">🔄</div>', unsafe_allow_html=True)
 
-# Main content area with two columns
-col1, col2 = st.columns(2)
-
-with col1:
-    st.markdown("<div class='card'>", unsafe_allow_html=True)
-    st.markdown("<p class='feature-title'>📝 First Question</p>", unsafe_allow_html=True)
-    q1 = st.text_area(
-        "Enter your first question here",
-        height=150,
-        placeholder="Type the first question here...",
-        key="q1"
-    )
-    st.markdown("</div>", unsafe_allow_html=True)
-
-with col2:
-    st.markdown("<div class='card'>", unsafe_allow_html=True)
-    st.markdown("<p class='feature-title'>📝 Second Question</p>", unsafe_allow_html=True)
-    q2 = st.text_area(
-        "Enter your second question here",
-        height=150,
-        placeholder="Type the second question here...",
-        key="q2"
-    )
-    st.markdown("</div>", unsafe_allow_html=True)
+# Main content area with two columns. The inputs live in a form so typing
+# doesn't trigger a rerun; the script only reruns when Compare is pressed.
+with st.form("compare_form", clear_on_submit=False):
+    if batch_mode:
+        st.markdown("<div class='card'>", unsafe_allow_html=True)
+        st.markdown("<p class='feature-title'>📝 Question Pairs</p>", unsafe_allow_html=True)
+        pairs_text = st.text_area(
+            "Enter one question pair per line, separated by a tab",
+            height=250,
+            placeholder="First question<TAB>Second question",
+            key="pairs"
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+    else:
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("<div class='card'>", unsafe_allow_html=True)
+            st.markdown("<p class='feature-title'>📝 First Question</p>", unsafe_allow_html=True)
+            q1 = st.text_area(
+                "Enter your first question here",
+                height=150,
+                placeholder="Type the first question here...",
+                key="q1"
+            )
+            st.markdown("</div>", unsafe_allow_html=True)
+
+        with col2:
+            st.markdown("<div class='card'>", unsafe_allow_html=True)
+            st.markdown("<p class='feature-title'>📝 Second Question</p>", unsafe_allow_html=True)
+            q2 = st.text_area(
+                "Enter your second question here",
+                height=150,
+                placeholder="Type the second question here...",
+                key="q2"
+            )
+            st.markdown("</div>", unsafe_allow_html=True)
 
-# Center the compare button
-col1, col2, col3 = st.columns([1, 2, 1])
-with col2:
-    compare_button = st.button("🔍 Compare Questions", use_container_width=True)
+    # Center the compare button
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        compare_button = st.form_submit_button("🔍 Compare Questions", use_container_width=True)
 
 # Results section
-if compare_button:
+if compare_button and batch_mode:
+    # Parse "question1<TAB>question2" lines, skipping blank ones
+    lines = [(i + 1, line.split("\t")) for i, line in enumerate(pairs_text.splitlines()) if line.strip()]
+    pairs = [pair for _, pair in lines]
+    bad_lines = [n for n, pair in lines
+                 if len(pair) != 2 or pair[0].strip() == "" or pair[1].strip() == ""]
+
+    if not pairs:
+        st.warning("⚠️ Please enter at least one question pair before comparing.")
+    elif bad_lines:
+        st.warning(f"⚠️ Lines {bad_lines} are not a tab-separated pair of non-empty questions.")
+    else:
+        with st.spinner("Analyzing questions..."):
+            qs1, qs2 = zip(*pairs)
+            cosine_sims = cached_similarity_scores(qs1, qs2)
+            results_df = pd.DataFrame({
+                "Question 1": qs1,
+                "Question 2": qs2,
+                "Similarity Score": cosine_sims,
+                "Duplicate": cosine_sims > similarity_threshold
+            })
+
+            st.markdown("<p class='feature-title'>Batch Results</p>", unsafe_allow_html=True)
+            st.dataframe(results_df, use_container_width=True)
+
+elif compare_button:
     if q1.strip() == "" or q2.strip() == "":
         st.warning("⚠️ Please enter both questions before comparing.")
     else:
         # Show a spinner while processing
         with st.spinner("Analyzing questions..."):
-            # Simulate processing time for better UX
-            time.sleep(1)
-
             # Get results from helper
-            query, result_message = helper.query_point_creator(q1, q2)
+            query, cosine_sim, result_message = cached_query_point(q1, q2)
 
-            # Extract cosine similarity from the query
-            cosine_sim = query[0, 22]  # Based on the helper code, index 22 is cosine similarity
+            # Slice the feature groups once; these are views into the query vector
+            q = query[0]
+            basic_features = q[0:7]
+            token_features = q[7:15]
+            length_features = q[15:18]
+            fuzzy_features = q[18:22]
 
             # Display results in a nice card
             st.markdown("<div class='result-card'>", unsafe_allow_html=True)
@@ -220,38 +435,17 @@ if compare_button:
 
                 # Similarity meter visualization
                 st.markdown("<p class='feature-title'>Similarity Score</p>", unsafe_allow_html=True)
-                st.markdown(f"""
-                <div class="similarity-meter">
-                    <div class="similarity-fill" style="width: {cosine_sim * 100}%; 
-                    background: linear-gradient(90deg, 
-                        {'#ff4e50' if cosine_sim < 0.3 else '#ffd452' if cosine_sim < 0.7 else '#1cb142'} 0%, 
-                        {'#f9d423' if cosine_sim < 0.3 else '#1cb142' if cosine_sim < 0.7 else '#0f9b0f'} 100%);">
-                    </div>
-                </div>
-                <p style="text-align: center; font-weight: bold; font-size: 1.5rem; margin: 10px 0;">
-                    {cosine_sim:.2f}
-                </p>
-                """, unsafe_allow_html=True)
+                if cosine_sim < 0.3:
+                    meter_tpl = LOW_METER_TPL
+                elif cosine_sim < 0.7:
+                    meter_tpl = MID_METER_TPL
+                else:
+                    meter_tpl = HIGH_METER_TPL
+                st.markdown(meter_tpl.format(w=cosine_sim * 100, score=cosine_sim), unsafe_allow_html=True)
 
                 # Result message with appropriate styling
-                if cosine_sim > similarity_threshold:
-                    st.markdown(f"""
-                    <div style="background-color: rgba(28, 177, 66, 0.1); border-left: 5px solid #1cb142; 
-                    padding: 15px; border-radius: 5px; margin-top: 20px;">
-                        <p style="font-size: 18px; font-weight: bold; color: #1cb142; margin: 0;">
-                            The questions are very similar or duplicates!
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div style="background-color: rgba(75, 108, 183, 0.1); border-left: 5px solid #4b6cb7; 
-                    padding: 15px; border-radius: 5px; margin-top: 20px;">
-                        <p style="font-size: 18px; font-weight: bold; color: #4b6cb7; margin: 0;">
-                            The questions are not duplicates.
-                        </p>
-                    </div>
-                    """, unsafe_allow_html=True)
+                st.markdown(DUP_HTML if cosine_sim > similarity_threshold else NOT_DUP_HTML,
+                            unsafe_allow_html=True)
 
             with col2:
                 # Display icon instead of animation if Lottie is not available
@@ -268,103 +462,16 @@ if compare_button:
             tab1, tab2, tab3 = st.tabs(["Feature Comparison", "3D Visualization", "Raw Data"])
 
             with tab1:
-                # Extract some key features for visualization
-                token_features = query[0, 7:15]  # Token features
-                fuzzy_features = query[0, 18:22]  # Fuzzy features
-
-                # Create bar chart for token features
-                token_fig = px.bar(
-                    x=["Common Word Ratio", "Word Ratio Max", "Stop Word Ratio", "Stop Word Ratio Max",
-                       "Token Ratio", "Token Ratio Max", "Last Word Match", "First Word Match"],
-                    y=token_features,
-                    labels={"x": "Feature", "y": "Value"},
-                    title="Token Features Comparison",
-                    color=token_features,
-                    color_continuous_scale="Blues",
-                    template="plotly_white"
-                )
-                token_fig.update_layout(height=400)
+                token_fig = _make_token_fig(tuple(token_features.round(4)))
                 st.plotly_chart(token_fig, use_container_width=True)
 
-                # Create radar chart for fuzzy features
-                fuzzy_fig = go.Figure()
-                fuzzy_fig.add_trace(go.Scatterpolar(
-                    r=fuzzy_features,
-                    theta=["Fuzz Ratio", "Partial Ratio", "Token Sort Ratio", "Token Set Ratio"],
-                    fill='toself',
-                    name='Fuzzy Features',
-                    line_color='#4b6cb7'
-                ))
-                fuzzy_fig.update_layout(
-                    polar=dict(
-                        radialaxis=dict(
-                            visible=True,
-                            range=[0, 100]
-                        )
-                    ),
-                    title="Fuzzy Matching Features",
-                    height=400,
-                    template="plotly_white"
-                )
+                fuzzy_fig = _make_fuzzy_fig(tuple(fuzzy_features.round(4)))
                 st.plotly_chart(fuzzy_fig, use_container_width=True)
 
             with tab2:
                 # Create 3D visualization of feature space
                 # We'll use the first 3 features for visualization
-                basic_features = query[0, 0:3]  # First 3 basic features
-
-                # Create a sample of points around our query point for visualization
-                n_points = 50
-                x = np.random.normal(basic_features[0], basic_features[0] * 0.2, n_points)
-                y = np.random.normal(basic_features[1], basic_features[1] * 0.2, n_points)
-                z = np.random.normal(basic_features[2], basic_features[2] * 0.2, n_points)
-
-                # Color based on distance from our point (simulating similarity)
-                distances = np.sqrt((x - basic_features[0]) ** 2 +
-                                    (y - basic_features[1]) ** 2 +
-                                    (z - basic_features[2]) ** 2)
-
-                # Create 3D scatter plot
-                fig_3d = go.Figure(data=[
-                    # Background points
-                    go.Scatter3d(
-                        x=x, y=y, z=z,
-                        mode='markers',
-                        marker=dict(
-                            size=5,
-                            color=distances,
-                            colorscale='Blues',
-                            opacity=0.6
-                        ),
-                        name='Feature Space'
-                    ),
-                    # Our query point
-                    go.Scatter3d(
-                        x=[basic_features[0]], y=[basic_features[1]], z=[basic_features[2]],
-                        mode='markers',
-                        marker=dict(
-                            size=10,
-                            color='red',
-                            symbol='diamond'
-                        ),
-                        name='Current Query'
-                    )
-                ])
-
-                # Update layout
-                fig_3d.update_layout(
-                    title="3D Feature Space Visualization",
-                    scene=dict(
-                        xaxis_title="Question 1 Length",
-                        yaxis_title="Question 2 Length",
-                        zaxis_title="Word Count Q1",
-                        xaxis=dict(backgroundcolor="#f5f7ff"),
-                        yaxis=dict(backgroundcolor="#f5f7ff"),
-                        zaxis=dict(backgroundcolor="#f5f7ff")
-                    ),
-                    height=600,
-                    margin=dict(l=0, r=0, b=0, t=30)
-                )
+                fig_3d = _make_3d_fig(tuple(basic_features[:3].round(4)))
 
                 st.plotly_chart(fig_3d, use_container_width=True)
 
@@ -380,44 +487,24 @@ if compare_button:
                 # Show raw feature data
                 st.markdown("<p class='feature-title'>Raw Feature Vector</p>", unsafe_allow_html=True)
 
-                # Format the data for better display
-                basic_features = query[0, 0:7]
-                token_features = query[0, 7:15]
-                length_features = query[0, 15:18]
-                fuzzy_features = query[0, 18:22]
-
                 col1, col2 = st.columns(2)
 
                 with col1:
                     st.markdown("##### Basic Features")
-                    basic_df = {
-                        "Feature": ["Q1 Length", "Q2 Length", "Q1 Word Count", "Q2 Word Count",
-                                    "Common Words", "Total Words", "Common/Total Ratio"],
-                        "Value": basic_features
-                    }
+                    basic_df = pd.DataFrame({"Feature": BASIC_LABELS, "Value": basic_features})
                     st.dataframe(basic_df, use_container_width=True)
 
                     st.markdown("##### Length Features")
-                    length_df = {
-                        "Feature": ["Absolute Length Diff", "Average Token Length", "Longest Common Substring Ratio"],
-                        "Value": length_features
-                    }
+                    length_df = pd.DataFrame({"Feature": LENGTH_LABELS, "Value": length_features})
                     st.dataframe(length_df, use_container_width=True)
 
                 with col2:
                     st.markdown("##### Token Features")
-                    token_df = {
-                        "Feature": ["Common Word Ratio", "Word Ratio Max", "Stop Word Ratio", "Stop Word Ratio Max",
-                                    "Token Ratio", "Token Ratio Max", "Last Word Match", "First Word Match"],
-                        "Value": token_features
-                    }
+                    token_df = pd.DataFrame({"Feature": TOKEN_LABELS, "Value": token_features})
                     st.dataframe(token_df, use_container_width=True)
 
                     st.markdown("##### Fuzzy Features")
-                    fuzzy_df = {
-                        "Feature": ["Fuzz Ratio", "Partial Ratio", "Token Sort Ratio", "Token Set Ratio"],
-                        "Value": fuzzy_features
-                    }
+                    fuzzy_df = pd.DataFrame({"Feature": FUZZY_LABELS, "Value": fuzzy_features})
                     st.dataframe(fuzzy_df, use_container_width=True)
 
                 st.markdown("##### Cosine Similarity")
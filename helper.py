@@ -2,16 +2,51 @@ import nltk
 nltk.download('stopwords')
 from nltk.corpus import stopwords
 import re
-from bs4 import BeautifulSoup
+import warnings
+from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
 import distance
 from fuzzywuzzy import fuzz
 import pickle
+import math
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+
+# Optional: Use numba to JIT the cosine kernel, but don't fail if it's not available
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Short questions can look like a URL or file name to BeautifulSoup; they are
+# always parsed as markup here, so this warning is noise.
+warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
 
 cv = pickle.load(open('cv.pkl','rb'))
 
 
+def _cos(a, b):
+    # Dot product and both norms in a single pass over the vectors
+    s = 0.0
+    na = 0.0
+    nb = 0.0
+    for i in range(a.shape[0]):
+        s += a[i] * b[i]
+        na += a[i] * a[i]
+        nb += b[i] * b[i]
+    return s / (math.sqrt(na) * math.sqrt(nb) + 1e-12)
+
+
+def _cos_numpy(a, b):
+    return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b) + 1e-12)
+
+
+if NUMBA_AVAILABLE:
+    _cosine = njit(cache=True, fastmath=True)(_cos)
+else:
+    _cosine = _cos_numpy
+
+
 def test_common_words(q1, q2):
     w1 = set(map(lambda word: word.lower().strip(), q1.split(" ")))
     w2 = set(map(lambda word: word.lower().strip(), q2.split(" ")))
@@ -151,7 +186,7 @@ def preprocess(q):
     q = q.replace("'ll", " will")
 
     # Removing HTML tags
-    q = BeautifulSoup(q)
+    q = BeautifulSoup(q, "html.parser")
     q = q.get_text()
 
     # Remove punctuations
@@ -162,11 +197,12 @@ def preprocess(q):
 
 
 def query_point_creator(q1, q2):
-    input_query = []
+    query, _, result_message = query_point_from_preprocessed(preprocess(q1), preprocess(q2))
+    return query, result_message
 
-    # preprocess
-    q1 = preprocess(q1)
-    q2 = preprocess(q2)
+
+def _handcrafted_features(q1, q2, identical=False):
+    input_query = []
 
     # fetch basic features
     input_query.append(len(q1))
@@ -182,25 +218,71 @@ def query_point_creator(q1, q2):
     input_query.extend(token_features)
 
     # fetch length based features
-    length_features = test_fetch_length_features(q1, q2)
+    if identical:
+        # the longest common substring of a string with itself is the whole string
+        length_features = [0, len(q1.split()), len(q1) / (len(q1) + 1)]
+    else:
+        length_features = test_fetch_length_features(q1, q2)
     input_query.extend(length_features)
 
     # fetch fuzzy features
     fuzzy_features = test_fetch_fuzzy_features(q1, q2)
     input_query.extend(fuzzy_features)
 
+    return input_query
+
+
+def _result_message(cosine_sim):
+    # Display duplicate status based on cosine similarity
+    if cosine_sim > 0.85:
+        return "The questions are very similar or duplicates!"
+    else:
+        return "The questions are not duplicates."
+
+
+def query_point_from_preprocessed(q1, q2):
+    # Like query_point_creator, for questions already passed through preprocess.
+    # Also returns the float64 cosine similarity, since the float32 copy in the
+    # query can land on the other side of a duplicate threshold.
+
+    # Identical questions: the pairwise comparisons below have known results
+    identical = q1 == q2 and q1 != ""
+
+    input_query = _handcrafted_features(q1, q2, identical)
+
     # bow feature for q1
     q1_bow = cv.transform([q1]).toarray()
 
     # bow feature for q2
-    q2_bow = cv.transform([q2]).toarray()
+    q2_bow = q1_bow if identical else cv.transform([q2]).toarray()
 
     # Compute cosine similarity between q1_bow and q2_bow
-    cosine_sim = cosine_similarity(q1_bow, q2_bow)[0][0]
+    if identical:
+        cosine_sim = 1.0 if q1_bow.any() else 0.0
+    else:
+        cosine_sim = float(_cosine(q1_bow[0].astype(np.float32), q2_bow[0].astype(np.float32)))
     input_query.append(cosine_sim)
 
-    # Display duplicate status based on cosine similarity
-    if cosine_sim > 0.85:
-        return np.hstack((np.array(input_query).reshape(1, 23), q1_bow, q2_bow)), "The questions are very similar or duplicates!"
-    else:
-        return np.hstack((np.array(input_query).reshape(1, 23), q1_bow, q2_bow)), "The questions are not duplicates."
+    # float32 halves the size of the vector handed to the charts
+    query = np.hstack((np.array(input_query).reshape(1, 23), q1_bow, q2_bow)).astype(np.float32, copy=False)
+
+    return query, cosine_sim, _result_message(cosine_sim)
+
+
+def batch_cosine_similarity(qs1, qs2):
+    # BoW cosine similarity for each pair (qs1[i], qs2[i]), i.e. column 22 of
+    # query_point_creator, without the per-pair handcrafted features
+    qs1 = [preprocess(q) for q in qs1]
+    qs2 = [preprocess(q) for q in qs2]
+    n = len(qs1)
+
+    # bow features for both sides in a single transform
+    bow = cv.transform(qs1 + qs2)
+    q1_bow = bow[:n]
+    q2_bow = bow[n:]
+
+    # Row-wise cosine similarity on the sparse matrices
+    dots = np.asarray(q1_bow.multiply(q2_bow).sum(axis=1)).ravel()
+    norms1 = np.sqrt(np.asarray(q1_bow.multiply(q1_bow).sum(axis=1)).ravel())
+    norms2 = np.sqrt(np.asarray(q2_bow.multiply(q2_bow).sum(axis=1)).ravel())
+    return dots / (norms1 * norms2 + 1e-12)